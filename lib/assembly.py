@@ -13,6 +13,8 @@
 # of genes in loci and loci in assemblies (genomes)
 
 class Gene:
+    __slots__ = ('name', 'start', 'end', 'qcovs', 'ppos')
+    
     def __init__(self, name: str, start: int, end: int, qcovs: float, ppos: float):
         '''Requires 5 arguments describing a sequnece that
            is a translated BLAST hit:
@@ -32,6 +34,8 @@ class Gene:
         return f'{self.name}({self.ppos})'
 
 class Locus:
+    __slots__ = ('name', 'acc', 'strand', 'genes')
+    
     def __init__(self, name: str, acc: str, strand: int, genes: list[Gene]):
         '''Requires 4 arguments describing a locus:
            name: str          -- locus name
@@ -49,6 +53,8 @@ class Locus:
         return '/'.join(repr(gene) for gene in self.genes)
 
 class Assembly:
+    __slots__ = ('asmid', 'tas', 'drugs')
+    
     def __init__(self, asmid: str):
         '''Contains two empty lists that are to be populated by references
            to Locus type objects and store information on TA systems and
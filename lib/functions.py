@@ -9,31 +9,141 @@
 # and antibiotic resistance determinants in Staphylococcus aureus. mSystems 0:e00957-24.
 # https://doi.org/10.1128/msystems.00957-24
 
+import os
+import mmap
 import numpy as np
 import pandas as pd
+from math import exp, lgamma
+from functools import lru_cache
 from collections import defaultdict
-from scipy.stats import hypergeom
+from collections.abc import Iterator
+from numba import njit
 from matplotlib import pyplot as plt
+from matplotlib.collections import LineCollection
+
+def iter_seqids(fpath: str) -> Iterator[str]:
+    '''Scans a FASTA format file for IDs of sequence records present in that file
+       and yields them one by one, in the order of appearance.
+       Arguments:
+       fpath: str -- a path to a FASTA format file with sequences
+       Yields:
+       seqid: str -- an ID of a subsequent sequence found in the file
+    '''
+    
+    # the file is only read through the memory map, so a Python-level buffer is of no use
+    with open(fpath, 'rb', buffering=0) as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # let the kernel read ahead aggressively, the file is traversed once from start to end
+            if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            # jump straight from one header line to the next,
+            # sequence lines are never scanned at the Python level
+            if mm[:1] == b'>':
+                pos = 1
+            else:
+                pos = mm.find(b'\n>') + 2
+                if pos < 2:
+                    return
+            while True:
+                eol = mm.find(b'\n', pos)
+                if eol < 0:
+                    eol = len(mm)
+                # exclude `\r` of Windows (CRLF) line endings from the header
+                end = eol - 1 if mm[eol-1:eol] == b'\r' else eol
+                space = mm.find(b' ', pos, end)
+                if space >= 0:
+                    end = space
+                # the ID is the last `|`-delimited field of the first header word
+                start = max(mm.rfind(b'|', pos, end) + 1, pos)
+                yield mm[start:end].decode()
+                pos = mm.find(b'\n>', eol) + 2
+                if pos < 2:
+                    break
+
 
 def fetch_seqids(fpath: str) -> list[str]:
     '''Scans a FASTA format file for IDs of sequence records present in that file.
+       See also `iter_seqids()` for a streaming variant.
        Arguments:
        fpath: str        -- a path to a FASTA format file with sequences
        Returns:
        seqids: list[str] -- a list with IDs for all sequences found in the file
     '''
     
-    seqids = []
-    f = open(fpath)
-    for line in f:
-        if line[0] == '>':
-            seqid = line[1:line.find(' ')]
-            seqid = seqid.rsplit('|', 1)[-1]
-            seqids.append(seqid)
-    f.close()
+    seqids = list(iter_seqids(fpath))
+    
     return seqids
 
 
+@njit(cache=True, fastmath=True)
+def _hyper_logpmf(k: int, M: int, n: int, N: int) -> float:
+    '''Calculates the natural logarithm of hypergeometric probability mass function value
+       for `k` successes in a sample of size `N` drawn from a population of size `M`
+       that contains `n` successes (the argument order follows `scipy.stats.hypergeom`).
+    '''
+    
+    return lgamma(n+1)   - lgamma(k+1)   - lgamma(n-k+1)     \
+         + lgamma(M-n+1) - lgamma(N-k+1) - lgamma(M-n-N+k+1) \
+         - lgamma(M+1)   + lgamma(N+1)   + lgamma(M-N+1)
+
+
+@njit(cache=True)
+def _hyper_sf(k: int, M: int, n: int, N: int) -> float:
+    '''Calculates hypergeometric survival function value, P(X > k), by summing probability mass
+       function values over whichever tail of the distribution, split at its mode, is shorter.
+       The arguments are the same as for `_hyper_logpmf()`.
+    '''
+    
+    low  = max(0, N-(M-n))
+    high = min(n, N)
+    if k < low:
+        return 1.0
+    if k >= high:
+        return 0.0
+    
+    mode = (N+1)*(n+1)//(M+2)
+    prob = 0.0
+    if k >= mode:
+        for i in range(k+1, high+1):
+            prob += exp(_hyper_logpmf(i, M, n, N))
+    else:
+        for i in range(low, k+1):
+            prob += exp(_hyper_logpmf(i, M, n, N))
+        prob = 1.0 - prob
+    
+    return min(max(prob, 0.0), 1.0)
+
+
+@njit(cache=True)
+def _hyper_cdf(k: int, M: int, n: int, N: int) -> float:
+    '''Calculates hypergeometric cumulative distribution function value, P(X <= k), by summing
+       probability mass function values over whichever tail of the distribution, split at its mode,
+       is shorter. The arguments are the same as for `_hyper_logpmf()`.
+    '''
+    
+    low  = max(0, N-(M-n))
+    high = min(n, N)
+    if k < low:
+        return 0.0
+    if k >= high:
+        return 1.0
+    
+    mode = (N+1)*(n+1)//(M+2)
+    prob = 0.0
+    if k < mode:
+        for i in range(low, k+1):
+            prob += exp(_hyper_logpmf(i, M, n, N))
+    else:
+        for i in range(k+1, high+1):
+            prob += exp(_hyper_logpmf(i, M, n, N))
+        prob = 1.0 - prob
+    
+    return min(max(prob, 0.0), 1.0)
+
+
+@lru_cache(maxsize=None)
 def sf_10(sample_size: int, total_cases: int, total_size: int) -> float:
     '''Calculates a probability value for hypergeometric distribution survival function (cumulative
        probability) for 10 or more occurrences of a given class cases in a sample of `sample_size`,
@@ -47,11 +157,40 @@ def sf_10(sample_size: int, total_cases: int, total_size: int) -> float:
        prob: float -- hypergeometric distribution survival function value.
     '''
     
-    prob = hypergeom.sf(10-1, total_size, total_cases, sample_size)
+    prob = _hyper_sf(10-1, int(total_size), int(total_cases), int(sample_size))
+    
+    return prob
+
+
+@njit(cache=True)
+def _hyper_signed(k: int, M: int, n: int, N: int) -> float:
+    '''Returns hypergeometric CDF value for `k` or SF value for `k-1`, whichever lower,
+       the former expressed as a negative value. The arguments are the same as
+       for `_hyper_logpmf()`.
+    '''
+    
+    prob_1 = _hyper_cdf(k,     M, n, N)
+    prob_2 = _hyper_sf(k - 1, M, n, N)
+    
+    if prob_1 <= prob_2: 
+        return -1*prob_1
+    else: 
+        return prob_2
+
+
+@njit(cache=True)
+def _hyper_arr(k: np.ndarray, M: np.ndarray, n: np.ndarray, N: np.ndarray) -> np.ndarray:
+    '''Applies `_hyper_signed()` element-wise to 1-D arrays of equal length.
+    '''
+    
+    prob = np.empty(k.shape[0])
+    for i in range(k.shape[0]):
+        prob[i] = _hyper_signed(k[i], M[i], n[i], N[i])
     
     return prob
 
 
+@lru_cache(maxsize=None)
 def hyper(sample_cases: int, sample_size: int, total_cases: int, total_size: int) -> float:
     '''Calculates a probability value for hypergeometric cumulative distribution function (CDF)
        or survival function (SF), whichever lower, for `sample_cases` or, respectively,
@@ -68,13 +207,34 @@ def hyper(sample_cases: int, sample_size: int, total_cases: int, total_size: int
        prob: float -- the value of a corresponding cumulative probability function.
     '''
     
-    prob_1 = hypergeom.cdf(sample_cases,    total_size, total_cases, sample_size)
-    prob_2 = hypergeom.sf(sample_cases - 1, total_size, total_cases, sample_size) 
+    prob = _hyper_signed(int(sample_cases), int(total_size), int(total_cases), int(sample_size))
     
-    if prob_1 <= prob_2: 
-        return -1*prob_1
-    else: 
-        return prob_2
+    return prob
+
+
+def hyper_vec(
+    sample_cases: np.ndarray, sample_size: np.ndarray,
+    total_cases: np.ndarray, total_size: np.ndarray
+) -> np.ndarray:
+    '''A vectorised version of `hyper()` that accepts array-like arguments
+       (e.g. Pandas DataFrame columns) and calculates all probability values in a single call.
+       The arguments are broadcast against each other.
+       Arguments:
+       sample_cases: np.ndarray -- the total counts of given class cases in the samples.
+       sample_size:  np.ndarray -- the sample sizes.
+       total_cases:  np.ndarray -- the total counts of given class cases in the general population.
+       total_size:   np.ndarray -- the sizes of the general population.
+       Returns:
+       prob: np.ndarray -- the values of corresponding cumulative probability functions.
+    '''
+    
+    args = np.broadcast_arrays(*(
+        np.asarray(arg, dtype=np.int64)
+        for arg in (sample_cases, total_size, total_cases, sample_size)
+    ))
+    prob = _hyper_arr(*(np.ascontiguousarray(arg).ravel() for arg in args))
+    
+    return prob.reshape(args[0].shape)
 
 
 def get_color(ratio: float) -> np.ndarray[ [float, float, float] ]:
@@ -95,6 +255,28 @@ def get_color(ratio: float) -> np.ndarray[ [float, float, float] ]:
         
     return color
 
+
+def get_color_vec(ratios: np.ndarray) -> np.ndarray:
+    '''A vectorised version of `get_color()` that maps an array of normalised ratio values
+       (in a range -1.0 to 1.0) to a blue-red color scale.
+       Arguments:
+       ratios: np.ndarray -- an array of normalised ratio values from a -1.0 to 1.0 range.
+       Returns:
+       colors: np.ndarray -- an array of the shape of `ratios` extended by the last dimension
+                             of size 3 with RGB color values mapped to 0.0 to 1.0 range.
+    '''
+    
+    ratios = np.asarray(ratios, dtype=float)
+    pos = np.clip(ratios, 0.0, None)
+    neg = np.clip(ratios, None, 0.0)
+    
+    colors = np.ones(ratios.shape + (3,))
+    colors[..., 0] += neg
+    colors[..., 1] += neg - pos
+    colors[..., 2] -= pos
+    
+    return colors
+
     
 def calc_ratios(fin_df: pd.DataFrame) -> pd.DataFrame:
     '''Given a Pandas DataFrame adds new `ratio` column with values of ratio of ratios.
@@ -124,17 +306,17 @@ def calc_ratios(fin_df: pd.DataFrame) -> pd.DataFrame:
     fin_df = fin_df.copy()
     # fraction of a given TA-carriers with a given resistance determinant
     # to the general count of TA-carriers
-    first_ratio = ( fin_df['corr'] /  fin_df['ta_count'] )
+    first_ratio = fin_df['corr'].to_numpy(dtype=float) / fin_df['ta_count'].to_numpy(dtype=float)
     # the general count of carriers of a given drug resistance determinant
     # to the size of the general population
-    other_ratio = ( fin_df['drug_count'] / fin_df['tot'] )
+    other_ratio = fin_df['drug_count'].to_numpy(dtype=float) / fin_df['tot'].to_numpy(dtype=float)
     
-    positive = first_ratio >= other_ratio
-    fin_df.loc[ positive, 'ratio'] =   first_ratio / other_ratio
-    fin_df.loc[~positive, 'ratio'] = - other_ratio / first_ratio
+    # `first_ratio` equal to 0 yields `-np.inf` in the negative branch
+    with np.errstate(divide='ignore'):
+        ratio = np.where(first_ratio >= other_ratio, first_ratio / other_ratio, - other_ratio / first_ratio)
     
-    fin_df.loc[fin_df['ratio'] > 0, 'log2_ratio'] =   np.log2(  fin_df.loc[fin_df['ratio'] > 0, 'ratio'])
-    fin_df.loc[fin_df['ratio'] < 0, 'log2_ratio'] = - np.log2(- fin_df.loc[fin_df['ratio'] < 0, 'ratio'])
+    fin_df['ratio']      = ratio
+    fin_df['log2_ratio'] = np.sign(ratio) * np.log2(np.abs(ratio))
     
     return fin_df
 
@@ -142,11 +324,12 @@ def calc_ratios(fin_df: pd.DataFrame) -> pd.DataFrame:
 def unstack_ratios(
     fin_df: pd.DataFrame, ta_count: defaultdict[str, int], drug_count: defaultdict[str, int],
     pval10_th: float, ratio_th: float, ratio_max: float, adjust: bool
-) -> tuple[pd.DataFrame, pd.DataFrame, float]:
+) -> tuple[pd.DataFrame, np.ndarray, float]:
     '''Given a Pandas DataFrame with the `log2_ratio` and `pval_10` columns, creates
-       two new DataFrames, the rows of which refere to TA systems, and the columns,
-       to drug resistance determinants. The values of the new DataFrames denotes, respectively,
-       the `log2_ratio` column values or those values mapped to a color scale. Before creation,
+       a new DataFrame, the rows of which refere to TA systems, and the columns,
+       to drug resistance determinants, and a Numpy Array of the same row and column layout.
+       The values of the new DataFrame denotes the `log2_ratio` column values, and the Array
+       holds those values mapped to a color scale (RGB triples along its last axis). Before creation,
        the input DataFrame is filtered in respect to `pval_10` column values and `-np.inf` values
        are replaced either by `ratio_max` value of its adjusted value. The `log2_ratio` values
        that do not meet the `pval_10` threshold (`pval10_th`) are set to 0 (not analysed further).
@@ -163,7 +346,7 @@ def unstack_ratios(
        the results obtained without adjustment and the returned `abs_max` value.
        The finally selected `log2_values` that exceeds ratio_max or -ratio_max values are reduced to
        `ratio_max` value. This might be useful for visualisation purposes. The rows and columns
-       of the final DataFrames are ordered by the count values of TA systems and
+       of the final DataFrame and Array are ordered by the count values of TA systems and
        drug resistance determinants in the general population in a descending manner.
        Arguments:
        fin_df: pd.DataFrame              -- the input DataFrame that contains `log2_ratio` column.
@@ -180,38 +363,40 @@ def unstack_ratios(
                                             of `log2_ratio`.
        Returns:
        ratio_df: pd.DataFrame -- the final DataFrame with adjusted `log2_ratio` values.
-       color_df: pd.DataFrame -- the final DataFrame with color values (`color`) that
-                                 are mapped to `log2_ratio` values.
+       colors: np.ndarray     -- the final Array of the shape (rows, columns, 3) with RGB
+                                 color values that are mapped to `log2_ratio` values.
        abs_max: float         -- the absolute maximal `log2_ratio` values (not accounting for
                                  -np.inf values) before any adjustment is done.
     '''
     
     fin_df = fin_df.copy()
-    fin_df.loc[
-        (fin_df['pval_10']  < pval10_th) | (fin_df['log2_ratio'].abs() < ratio_th), 'log2_ratio'
-    ] = 0.0
+    log2_ratio = fin_df['log2_ratio'].to_numpy(dtype=float, copy=True)
+    abs_ratio  = np.abs(log2_ratio)
+    log2_ratio[(fin_df['pval_10'].to_numpy() < pval10_th) | (abs_ratio < ratio_th)] = 0.0
     
-    abs_max = fin_df.loc[fin_df['log2_ratio'] != -np.inf, 'log2_ratio'].abs().max()
+    not_neg_inf = log2_ratio != -np.inf
+    abs_kept    = np.abs(log2_ratio[not_neg_inf])
+    # NaN if there is nothing to take the maximum of, as Pandas `max()` would return
+    abs_max = np.nanmax(abs_kept) if not np.isnan(abs_kept).all() else np.nan
     
     adj_max = np.log2(abs_max) if adjust else ratio_max
-    fin_df.loc[fin_df['log2_ratio'] == -np.inf, 'log2_ratio'] = -adj_max
+    log2_ratio[~not_neg_inf] = -adj_max
     
-    fin_df.loc[fin_df['log2_ratio'] >  ratio_max,  'log2_ratio'] =  ratio_max
-    fin_df.loc[fin_df['log2_ratio'] < -ratio_max,  'log2_ratio'] = -ratio_max
+    np.clip(log2_ratio, -ratio_max, ratio_max, out=log2_ratio)
+    fin_df['log2_ratio'] = log2_ratio
     
-    fin_df['color'] = (fin_df['log2_ratio']/ratio_max).apply(get_color)
-    ratio_df, color_df = (
-        fin_df.set_index('ta drug'.split())[col].unstack()
-        for col in 'log2_ratio color'.split()
-    )
-    ratio_df.sort_index(key=lambda ind: [ta_count[key] for key in ind  ],
-                        ascending=False, inplace=True)
-    ratio_df.sort_index(key=lambda ind: [drug_count[key] for key in ind],
-                        ascending=False, axis=1, inplace=True)
+    ratio_df = fin_df.set_index('ta drug'.split())['log2_ratio'].unstack()
+    # the same (quicksort) ordering `sort_index(key=...)` applies, so that elements of equal
+    # count are laid out exactly as in the published results
+    _, ta_order   = pd.Index([ ta_count[key]   for key in ratio_df.index   ]) \
+                      .sort_values(ascending=False, return_indexer=True)
+    _, drug_order = pd.Index([ drug_count[key] for key in ratio_df.columns ]) \
+                      .sort_values(ascending=False, return_indexer=True)
+    ratio_df = ratio_df.iloc[ta_order, drug_order]
     
-    color_df = color_df.loc[ratio_df.index, ratio_df.columns]
+    colors = get_color_vec(ratio_df.to_numpy()/ratio_max)
     
-    return ratio_df, color_df, abs_max
+    return ratio_df, colors, abs_max
 
 
 def final_filter(
@@ -232,30 +417,43 @@ def final_filter(
     '''
     
     filtered_df = ratio_df.loc[
-        ~ratio_df.index.isin(remove),
-        ~ratio_df.columns.isin(remove)
-    ].copy()
+        ratio_df.index.difference(remove, sort=False),
+        ratio_df.columns.difference(remove, sort=False)
+    ]
     if filter_blank:
+        row_sums = filtered_df.sum(axis=1).to_numpy()
+        col_sums = filtered_df.sum(axis=0).to_numpy()
         filtered_df = filtered_df.loc[
-            (filtered_df.sum(axis=1) != 0) | filtered_df.index.isin(keep),
-            (filtered_df.sum()       != 0) | filtered_df.columns.isin(keep)
+            (row_sums != 0) | filtered_df.index.isin(keep),
+            (col_sums != 0) | filtered_df.columns.isin(keep)
         ]
     return filtered_df
 
 
+def _grid_lines(rows: int, cols: int) -> LineCollection:
+    '''Creates a single collection of horizontal and vertical lines delimiting basic units (cells)
+       of a heatmap with `rows` rows and `cols` columns, in image pixel coordinates.
+    '''
+    
+    segments  = [ ((-0.5, -0.5+y), (cols-0.5, -0.5+y)) for y in range(rows+1) ]
+    segments += [ ((-0.5+x, -0.5), (-0.5+x, rows-0.5)) for x in range(cols+1) ]
+    
+    return LineCollection(segments, linewidths=0.1, colors='black')
+
+
 def plot_ratios(
-    ratio_df: pd.DataFrame, color_df: pd.DataFrame,
+    ratio_df: pd.DataFrame, colors: np.ndarray,
     ta_count: defaultdict[str, int], drug_count: defaultdict[str, int],
     alt_names: dict[str, str], fig_width: float, ax_left: float, ax_right: float,
     ax_top: float, ax_bottom: float, bar_count: float, bar_scale: float,
     bar_left: float, bar_bottom: float, ratio_max: float
 ) -> tuple[plt.Figure, plt.Axes, plt.Axes]:
-    '''Given Pandas DataFrames with ratio of ratio values and colors mapped to them,
-       plots the final visualisation, a heatmap and a heatmap scale bar.
+    '''Given a Pandas DataFrame with ratio of ratio values and a Numpy Array with colors
+       mapped to them, plots the final visualisation, a heatmap and a heatmap scale bar.
        Arguments:
        ratio_df: pd.DataFrame -- a Pandas DataFrame with ratio of ratios values.
-       color_df: pd.DataFrame -- a Pandas DataFrame with color values mapped
-                                 to the ratio of ratios values.
+       colors: np.ndarray     -- a Numpy Array of the shape (rows, columns, 3) with RGB color
+                                 values mapped to the ratio of ratios values.
        ta_count: defaultdict[str, int]   -- a dafaultdict mapping TA systems names
                                             to their total count.
        drug_count: defaultdict[str, int] -- a dafaultdict mapping drug resistance determinants
@@ -280,19 +478,15 @@ def plot_ratios(
        bar_bottom: float -- bottom spacing of the heatmap scale bar axis from the figure edge
                             expressed as a fraction of the total figure height.
        ratio_max: float  -- maximal absolute value to be used for the scale bar. Should be the same
-                            as one used for scaling the data in the input color_df DataFrame.
+                            as one used for scaling the data in the input colors Array.
        Returns:
        fig: plt.Figure  -- the reference to the final Figure.
        ax: plt.Axes     -- the reference to the heatmap Axes.
        bar_ax: plt.Axes -- the reference to the heatmap scale bar Axes.
     '''
     
-    data = np.stack(
-        color_df.to_numpy().reshape(color_df.shape[0]*color_df.shape[1])
-    ).reshape( (color_df.shape[0], color_df.shape[1], 3) )
-
     fig_height = ax_bottom + ax_top + (fig_width-ax_left-ax_right) \
-                 * data.shape[0] / data.shape[1]
+                 * colors.shape[0] / colors.shape[1]
 
     ax_pwidth  = 1.0-(ax_left+ax_right)/fig_width
     ax_pheight = 1.0-(ax_top+ax_bottom)/fig_height
@@ -302,53 +496,51 @@ def plot_ratios(
     fig = plt.figure(figsize=(fig_width, fig_height), facecolor='white', dpi=150)
     ax = fig.add_axes([ax_pleft, ax_pbottom, ax_pwidth, ax_pheight])
 
-    for y in range(data.shape[0]+1):
-        ax.hlines(-0.5+y, -0.5, data.shape[1], linewidth=0.1, color='black')
-    for x in range(data.shape[1]+1):
-        ax.vlines(-0.5+x, -0.5, data.shape[0], linewidth=0.1, color='black')
+    ax.add_collection(_grid_lines(colors.shape[0], colors.shape[1]))
 
-    ax.imshow(data, aspect='auto')
+    ax.imshow(colors, aspect='auto')
 
-    ratios = ratio_df.abs().to_numpy()
+    ratios = np.abs(ratio_df.to_numpy())
+    zero   = ratios == 0
+    dark   = ratios > ratio_max/2 + 1
     
-    indices = np.nonzero(np.abs(ratios) != 0)
-    for row, col in zip(*indices):
-        color = 'black' if ratios[row, col] <= ratio_max/2 + 1 else 'white'
+    # labels are drawn row by row, so that overlapping ones stack in a stable order
+    for row, col in zip(*np.nonzero(~zero)):
+        color = 'white' if dark[row, col] else 'black'
         ax.text(col, row, f'{ratios[row, col]:0.1f}', ha='center', va='center', color=color, fontsize=11.0)
         
-    indices = np.nonzero(np.abs(ratios) == 0)
-    for row, col in zip(*indices):
-        ax.scatter(col, row, s=0.75, linewidth=0.0, color='lightgray')
+    rows, cols = np.nonzero(zero)
+    ax.scatter(cols, rows, s=0.75, linewidth=0.0, color='lightgray')
     
-    get_name = lambda drug_name: alt_names.get(drug_name, drug_name).replace('_', '\_')
+    # escape underscores in alternative names up front, for mathtext italics
+    escaped  = { name : alt_name.replace('_', r'\_') for name, alt_name in alt_names.items() }
+    get_name = lambda drug_name: escaped[drug_name] if drug_name in escaped \
+                                 else drug_name.replace('_', r'\_')
     ta_labels   = [ f'{alt_names.get(ta_name, ta_name)} ({ta_count[ta_name]})'
-                    for ta_name   in color_df.index   ]
-    drug_labels = [ f'$\it {get_name(drug_name)}$ ({drug_count[drug_name]})'
-                    for drug_name in color_df.columns ]
+                    for ta_name   in ratio_df.index   ]
+    drug_labels = [ rf'$\it {get_name(drug_name)}$ ({drug_count[drug_name]})'
+                    for drug_name in ratio_df.columns ]
 
-    ax.set_xticks(range(data.shape[1]), drug_labels, fontsize=13.0, rotation=90)
-    ax.set_yticks(range(data.shape[0]), ta_labels, fontsize=13.0)
-    ax.spines['top bottom right left'.split()].set_visible(False)
+    ax.set_xticks(range(colors.shape[1]), drug_labels, fontsize=13.0, rotation=90)
+    ax.set_yticks(range(colors.shape[0]), ta_labels, fontsize=13.0)
+    for spine in ax.spines.values():
+        spine.set_visible(False)
     ax.tick_params(axis='both', which='both', length=0)
-    ax.set_xlim((0-0.5, data.shape[1]-0.5))
-    ax.set_ylim((data.shape[0]-0.5, 0-0.5))
+    ax.set_xlim((0-0.5, colors.shape[1]-0.5))
+    ax.set_ylim((colors.shape[0]-0.5, 0-0.5))
     ax.set_title('Occurrence rate ratio of drug determinants and TA systems', fontsize=16)
 
-    bar_pwidth  = ax_pwidth  / data.shape[1] * bar_count * bar_scale
-    bar_pheight = ax_pheight / data.shape[0] * bar_scale
+    bar_pwidth  = ax_pwidth  / colors.shape[1] * bar_count * bar_scale
+    bar_pheight = ax_pheight / colors.shape[0] * bar_scale
 
     bar_ax = fig.add_axes([bar_left, bar_bottom, bar_pwidth, bar_pheight])
 
-    for y in range(2):
-        bar_ax.hlines(-0.5+y, -0.5, data.shape[1], linewidth=0.1, color='black')
-    for x in range(bar_count+1):
-        bar_ax.vlines(-0.5+x, -0.5, data.shape[0], linewidth=0.1, color='black')
+    bar_ax.add_collection(_grid_lines(1, bar_count))
 
-    bar_data = np.array(
-        [ get_color(ratio) for ratio in np.linspace(-1, 1, bar_count) ]
-    ).reshape(3*bar_count).reshape((1, bar_count, 3))
+    bar_data = get_color_vec(np.linspace(-1, 1, bar_count))[np.newaxis]
 
-    bar_ax.spines['top bottom right left'.split()].set_visible(False)
+    for spine in bar_ax.spines.values():
+        spine.set_visible(False)
     bar_ax.tick_params(axis='both', which='both', length=0)
     bar_ax.set_yticks([])
     bar_labels = [